@@ -11,6 +11,8 @@ import webbrowser
 import re
 import platform
 import subprocess
+import shutil
+import html
 from PIL import Image, ImageDraw
 
 # ОПРЕДЕЛЕНИЕ СИСТЕМЫ
@@ -70,6 +72,68 @@ def generate_time_scale():
 
 TIME_SCALE = generate_time_scale()
 
+# --- БЭКЕНДЫ УВЕДОМЛЕНИЙ ---
+# needs_tk = True -> вызывается в главном потоке через root.after,
+# иначе notify() вызывается в отдельном потоке, без создания окон Tk.
+class NotificationBackend:
+    name = None
+    label = None
+    needs_tk = False
+    def __init__(self, app):
+        self.app = app
+        self._available = None
+    def available(self):
+        # Кэшируем: проверка может искать программу в PATH, а вызывается на каждое срабатывание
+        if self._available is None: self._available = self.check_available()
+        return self._available
+    def check_available(self): return True
+    # Контракт: показать уведомление. Исключение -> send_notification откатится на окно
+    def notify(self, task): pass
+
+class PopupNotifier(NotificationBackend):
+    name = "popup"
+    label = "Окно"
+    needs_tk = True
+    def notify(self, task): self.app.create_popup(task)
+
+class NativeNotifier(NotificationBackend):
+    name = "native"
+    label = "Система"
+    def check_available(self):
+        if CURRENT_OS == 'Darwin': return shutil.which("osascript") is not None
+        if CURRENT_OS == 'Windows': return False
+        return shutil.which("notify-send") is not None
+    def build_command(self, task):
+        msg = task["msg"]
+        if CURRENT_OS == 'Darwin':
+            esc = lambda s: s.replace("\\", "\\\\").replace('"', '\\"')
+            return ["osascript", "-e", f'display notification "{esc(msg)}" with title "{esc(APP_TITLE)}"']
+        # notify-send: -t 0 = не закрывать автоматически; "--" чтобы текст с "-" не считался опцией;
+        # тело разбирается как разметка, поэтому экранируем < и &
+        return ["notify-send", "-a", APP_TITLE, "-t", str(task.get("auto_close", 10) * 1000), "--", APP_TITLE, html.escape(msg, quote=False)]
+    def notify(self, task):
+        # run, а не Popen: вызывается в своём потоке, и код возврата нужен для отката на окно.
+        # Таймаут считаем успехом: медленный notify-send обычно уже показал уведомление.
+        # Звук только после отправки, иначе окно-замена сыграет его второй раз.
+        try: subprocess.run(self.build_command(task), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=5, check=True)
+        except subprocess.TimeoutExpired: pass
+        self.app.play_sound_cross_platform(task.get("sound"))
+
+class RecordingNotifier(NotificationBackend):
+    # Заглушка для тестов: ничего не показывает, только запоминает задачи.
+    # В NOTIFIERS не входит — тесты подставляют её в app.notifiers сами.
+    name = "record"
+    label = "Запись (тест)"
+    def __init__(self, app):
+        super().__init__(app)
+        self.sent = []
+    def notify(self, task): self.sent.append(dict(task))
+
+NOTIFIER_CHOICES = [PopupNotifier, NativeNotifier]  # то, что видно в интерфейсе
+NOTIFIERS = {cls.name: cls for cls in NOTIFIER_CHOICES}
+NOTIFIER_DEFAULT_LABEL = "По умолчанию"
+NOTIFIER_UNAVAILABLE = " (недоступно)"
+
 class ReminderApp:
     def __init__(self, root):
         self.root = root
@@ -86,6 +150,8 @@ class ReminderApp:
         self.user_presets = []
         self.sound_file = None
         self.tray_icon = None
+        self.default_notifier = "popup"
+        self.notifiers = {}
         
         self.load_data()
 
@@ -248,6 +314,10 @@ class ReminderApp:
         self.combo_autoclose.set("10 сек")
         self.combo_autoclose.pack(side="left", padx=5)
 
+        self.combo_notifier = ttk.Combobox(opts_frame, values=self.task_notifier_values(), width=12, state="readonly")
+        self.combo_notifier.set(NOTIFIER_DEFAULT_LABEL)
+        self.combo_notifier.pack(side="left", padx=5)
+
         self.btn_sound = tk.Button(opts_frame, text="🎵 Звук", bg=C_PANEL, fg=C_FG, relief="flat", command=self.select_sound)
         self.btn_sound.pack(side="right")
 
@@ -262,6 +332,12 @@ class ReminderApp:
         else:
             tk.Label(startup_frame, text="(Автозагрузка доступна в настройках системы)", bg=C_BG, fg="#555").pack(side="left")
 
+        self.combo_default_notifier = ttk.Combobox(startup_frame, values=[n.label for n in self.notifier_choices()], width=10, state="readonly")
+        self.combo_default_notifier.set(self.get_notifier({}).label)
+        self.combo_default_notifier.bind("<<ComboboxSelected>>", self.set_default_notifier)
+        self.combo_default_notifier.pack(side="right")
+        tk.Label(startup_frame, text="Уведомления:", bg=C_BG, fg="#888").pack(side="right", padx=5)
+
         self.btn_create = tk.Button(self.tab_create, text="СОЗДАТЬ ПРОКРАСТИНАЦИЮ!", bg=C_BTN_GREEN, fg="white", 
                                     font=("Arial", 11, "bold"), height=2, relief="flat", command=self.create_task)
         self.btn_create.pack(side="bottom", fill="x", padx=20, pady=20)
@@ -466,6 +542,44 @@ class ReminderApp:
         f = filedialog.askopenfilename(filetypes=[("WAV", "*.wav")])
         if f: self.sound_file = f
 
+    def set_default_notifier(self, event=None):
+        self.default_notifier = self.notifier_by_label(self.combo_default_notifier.get()) or "popup"
+        self.save_data()
+
+    def get_backend(self, name):
+        # Неизвестные имена (в т.ч. из файла данных) -> окно, чтобы напоминание не потерялось
+        if name not in self.notifiers and name not in NOTIFIERS: name = "popup"
+        if name not in self.notifiers:
+            self.notifiers[name] = NOTIFIERS[name](self)
+        return self.notifiers[name]
+
+    def notifier_choices(self):
+        return [n for n in NOTIFIER_CHOICES if self.get_backend(n.name).available()]
+
+    def task_notifier_values(self):
+        return [NOTIFIER_DEFAULT_LABEL] + [n.label for n in self.notifier_choices()]
+
+    def notifier_by_label(self, label):
+        label = label.replace(NOTIFIER_UNAVAILABLE, "")
+        return next((n.name for n in NOTIFIER_CHOICES if n.label == label), None)
+
+    def get_notifier(self, task):
+        backend = self.get_backend(task.get("notifier") or self.default_notifier)
+        if not backend.available(): backend = self.get_backend("popup")
+        return backend
+
+    def fire_notification(self, task):
+        backend = self.get_notifier(task)
+        if backend.needs_tk: self.root.after(0, lambda: backend.notify(task))
+        # Не блокируем checker_loop ожиданием внешней программы
+        else: threading.Thread(target=self.send_notification, args=(backend, task), daemon=True).start()
+
+    def send_notification(self, backend, task):
+        try: backend.notify(task)
+        except Exception:
+            popup = self.get_backend("popup")
+            self.root.after(0, lambda: popup.notify(task))
+
     def create_task(self):
         msg = self.text_area.get("1.0", tk.END).strip()
         if not msg: return messagebox.showerror("Ошибка", "Пусто")
@@ -483,8 +597,9 @@ class ReminderApp:
         if self.chk_italic.get(): ft.append("italic")
         if self.chk_underline.get(): ft.append("underline")
         ac_map = {"10 сек": 10, "30 сек": 30, "1 минута": 60, "Никогда": 0}
+        notifier = self.notifier_by_label(self.combo_notifier.get())
         task = { "id": int(time.time()*1000), "msg": msg, "time": dt.timestamp(), "bg": self.text_area.cget("bg"), "fg": self.text_area.cget("fg"),
-                 "sound": self.sound_file, "auto_close": ac_map.get(self.combo_autoclose.get(), 10), "repeat_min": rep, "font_style": ft, "paused": False }
+                 "sound": self.sound_file, "auto_close": ac_map.get(self.combo_autoclose.get(), 10), "repeat_min": rep, "font_style": ft, "paused": False, "notifier": notifier }
         self.tasks.append(task); self.save_data(); self.redraw_task_list()
         self.btn_create.config(text="ГОТОВО!", bg="white", fg="green")
         self.root.after(1000, lambda: self.btn_create.config(text="СОЗДАТЬ ПРОКРАСТИНАЦИЮ!", bg=C_BTN_GREEN, fg="white"))
@@ -497,6 +612,11 @@ class ReminderApp:
         self.notebook.select(self.tab_create)
         self.text_area.delete("1.0", tk.END); self.text_area.insert("1.0", task["msg"])
         self.apply_preset(task["bg"], task["fg"])
+        # Недоступный здесь бэкенд показываем с пометкой, чтобы пересохранение не сбросило выбор
+        values = self.task_notifier_values(); name = task.get("notifier")
+        label = NOTIFIERS[name].label if name in NOTIFIERS else NOTIFIER_DEFAULT_LABEL
+        if label not in values: label += NOTIFIER_UNAVAILABLE; values.append(label)
+        self.combo_notifier.config(values=values); self.combo_notifier.set(label)
 
     def create_popup(self, task):
         self.play_sound_cross_platform(task["sound"])
@@ -621,7 +741,7 @@ class ReminderApp:
         if self.tray_icon: self.tray_icon.stop()
         os._exit(0)
     def save_data(self):
-        data = {"tasks": self.tasks, "archive": self.archive, "user_presets": self.user_presets, "sound_file": self.sound_file}
+        data = {"tasks": self.tasks, "archive": self.archive, "user_presets": self.user_presets, "sound_file": self.sound_file, "default_notifier": self.default_notifier}
         try: 
             with open(DATA_FILE, "w", encoding="utf-8") as f:
                 json.dump(data, f, indent=4)
@@ -637,6 +757,7 @@ class ReminderApp:
                         self.archive = data.get("archive", [])
                         self.user_presets = data.get("user_presets", [])
                         self.sound_file = data.get("sound_file", None)
+                        self.default_notifier = data.get("default_notifier", "popup")
             except: self.tasks = []
     
     def play_sound_cross_platform(self, sound_path):
@@ -660,9 +781,11 @@ class ReminderApp:
             proc = [t for t in self.tasks if t["time"] <= now and not t.get('paused')]
             if proc:
                 for t in proc:
-                    self.root.after(0, lambda task=t: self.create_popup(task))
+                    # Сначала учёт: задачу могли удалить из интерфейса, пока шёл цикл
                     if t["repeat_min"] > 0: t["time"] = now + (t["repeat_min"]*60)
-                    else: self.tasks.remove(t)
+                    elif t in self.tasks: self.tasks.remove(t)
+                    try: self.fire_notification(t)
+                    except Exception: pass
                 self.save_data(); self.root.after(0, self.redraw_task_list)
             time.sleep(1)
 
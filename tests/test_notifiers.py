@@ -0,0 +1,172 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+# pystray без дисплея падает при импорте не с ImportError
+os.environ.setdefault("PYSTRAY_BACKEND", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Procrastinator_Magnus_mac as pm
+
+
+class FakeRoot:
+    def __init__(self): self.scheduled = []
+    def after(self, delay, func):
+        self.scheduled.append(func)
+        func()
+
+
+class SyncThread:
+    # Отправка через бэкенд без Tk идёт в отдельном потоке; в тестах выполняем сразу
+    def __init__(self, target, args=(), daemon=None): self.target, self.args = target, args
+    def start(self): self.target(*self.args)
+
+
+@pytest.fixture
+def app(monkeypatch):
+    monkeypatch.setattr(pm.threading, "Thread", SyncThread)
+    # Без Tk: только то, что нужно для выбора и вызова бэкенда
+    a = pm.ReminderApp.__new__(pm.ReminderApp)
+    a.root = FakeRoot()
+    a.notifiers = {}
+    a.notifiers["record"] = pm.RecordingNotifier(a)
+    a.default_notifier = "record"
+    a.tasks, a.archive, a.user_presets, a.sound_file = [], [], [], None
+    a.popups, a.sounds = [], []
+    a.create_popup = lambda task: a.popups.append(task["msg"])
+    a.play_sound_cross_platform = lambda path: a.sounds.append(path)
+    return a
+
+
+def make_task(msg="hello", notifier=None):
+    return {"msg": msg, "auto_close": 10, "sound": None, "notifier": notifier}
+
+
+def test_default_backend_used_when_task_has_none(app):
+    app.fire_notification(make_task())
+    assert [t["msg"] for t in app.notifiers["record"].sent] == ["hello"]
+    assert app.popups == [] and app.root.scheduled == []
+
+
+def test_task_overrides_default(app):
+    app.fire_notification(make_task(notifier="popup"))
+    assert app.popups == ["hello"]
+    assert app.notifiers["record"].sent == []
+
+
+def test_unknown_persisted_name_goes_to_popup(app):
+    del app.notifiers["record"]
+    app.fire_notification(make_task(notifier="record"))
+    assert app.popups == ["hello"]
+    assert "record" not in pm.NOTIFIERS
+
+
+def test_unavailable_backend_falls_back_to_popup(app, monkeypatch):
+    monkeypatch.setattr(pm.NativeNotifier, "check_available", lambda self: False)
+    app.fire_notification(make_task(notifier="native"))
+    assert app.popups == ["hello"]
+
+
+def test_failed_native_falls_back_to_popup_without_double_sound(app, monkeypatch):
+    monkeypatch.setattr(pm.NativeNotifier, "check_available", lambda self: True)
+    def fail(cmd, **kw): raise subprocess.CalledProcessError(1, cmd)
+    monkeypatch.setattr(pm.subprocess, "run", fail)
+    app.fire_notification(make_task(notifier="native"))
+    assert app.popups == ["hello"]
+    assert app.sounds == []
+
+
+def test_native_success_plays_sound(app, monkeypatch):
+    monkeypatch.setattr(pm.NativeNotifier, "check_available", lambda self: True)
+    calls = []
+    monkeypatch.setattr(pm.subprocess, "run", lambda cmd, **kw: calls.append(cmd))
+    app.fire_notification(make_task(notifier="native"))
+    assert len(calls) == 1 and app.sounds == [None] and app.popups == []
+
+
+def test_native_timeout_counts_as_sent(app, monkeypatch):
+    monkeypatch.setattr(pm.NativeNotifier, "check_available", lambda self: True)
+    def slow(cmd, **kw): raise subprocess.TimeoutExpired(cmd, kw.get("timeout"))
+    monkeypatch.setattr(pm.subprocess, "run", slow)
+    app.fire_notification(make_task(notifier="native"))
+    assert app.popups == [] and app.sounds == [None]
+
+
+def test_launch_failure_falls_back_to_popup(app, monkeypatch):
+    monkeypatch.setattr(pm.NativeNotifier, "check_available", lambda self: True)
+    def missing(cmd, **kw): raise FileNotFoundError(cmd[0])
+    monkeypatch.setattr(pm.subprocess, "run", missing)
+    app.fire_notification(make_task(notifier="native"))
+    assert app.popups == ["hello"]
+
+
+def test_effective_default_when_native_unavailable(app, monkeypatch):
+    monkeypatch.setattr(pm.NativeNotifier, "check_available", lambda self: False)
+    app.default_notifier = "native"
+    assert app.get_notifier({}).label == pm.PopupNotifier.label
+
+
+def test_notifier_by_label_keeps_unavailable_choice(app):
+    assert app.notifier_by_label(pm.NativeNotifier.label + pm.NOTIFIER_UNAVAILABLE) == "native"
+    assert app.notifier_by_label(pm.NOTIFIER_DEFAULT_LABEL) is None
+
+
+def test_checker_loop_survives_failure_and_removed_task(app, monkeypatch):
+    once, gone = make_task("once"), make_task("gone")
+    repeat = dict(make_task("repeat"), repeat_min=5)
+    for t in (once, gone, repeat): t.update(time=0, paused=False); t.setdefault("repeat_min", 0)
+    app.tasks = [gone, once, repeat]
+    fired = []
+    def fire(task):
+        fired.append(task["msg"])
+        # Пока идёт цикл, интерфейс удаляет ещё не обработанную задачу; первая отправка падает
+        if once in app.tasks: app.tasks.remove(once)
+        if task is gone: raise RuntimeError("boom")
+    app.fire_notification = fire
+    app.save_data = lambda: None
+    app.redraw_task_list = lambda: None
+    app.stop_threads = False
+    def stop(seconds): app.stop_threads = True
+    monkeypatch.setattr(pm.time, "sleep", stop)
+    app.checker_loop()
+    assert fired == ["gone", "once", "repeat"]
+    assert app.tasks == [repeat] and repeat["time"] > 0
+
+
+def test_availability_is_cached(app, monkeypatch):
+    lookups = []
+    monkeypatch.setattr(pm.shutil, "which", lambda name: lookups.append(name))
+    for _ in range(3): app.get_notifier(make_task(notifier="native"))
+    assert len(lookups) == 1
+
+
+def test_notifier_choices_hide_unavailable(app, monkeypatch):
+    monkeypatch.setattr(pm.NativeNotifier, "check_available", lambda self: False)
+    assert app.notifier_choices() == [pm.PopupNotifier]
+
+
+def test_build_command_linux(app, monkeypatch):
+    monkeypatch.setattr(pm, "CURRENT_OS", "Linux")
+    cmd = pm.NativeNotifier(app).build_command({"msg": "-x <b> & go", "auto_close": 0})
+    assert cmd == ["notify-send", "-a", pm.APP_TITLE, "-t", "0", "--", pm.APP_TITLE, "-x &lt;b&gt; &amp; go"]
+
+
+def test_build_command_darwin(app, monkeypatch):
+    monkeypatch.setattr(pm, "CURRENT_OS", "Darwin")
+    cmd = pm.NativeNotifier(app).build_command({"msg": 'say "hi" \\o/', "auto_close": 10})
+    assert cmd == ["osascript", "-e", f'display notification "say \\"hi\\" \\\\o/" with title "{pm.APP_TITLE}"']
+
+
+def test_notifier_round_trip(app, monkeypatch, tmp_path):
+    monkeypatch.setattr(pm, "DATA_FILE", str(tmp_path / "data.json"))
+    app.default_notifier = "native"
+    app.tasks = [make_task(notifier="popup")]
+    app.save_data()
+    loaded = pm.ReminderApp.__new__(pm.ReminderApp)
+    loaded.tasks, loaded.archive, loaded.user_presets, loaded.sound_file = [], [], [], None
+    loaded.default_notifier = "popup"
+    loaded.load_data()
+    assert loaded.default_notifier == "native"
+    assert loaded.tasks[0]["notifier"] == "popup"